@@ -5,9 +5,13 @@ Functions for converting "coordinates" in netCDF variable attributes
  between paths that reference a group hierarchy and flattened paths.
 """
 
+from __future__ import annotations
+
 import json
 import re
+from collections.abc import Iterable
 from datetime import datetime, timezone
+from pathlib import Path
 
 import importlib_metadata
 import netCDF4
@@ -222,6 +226,22 @@ def retrieve_history(dataset: netCDF4.Dataset) -> dict:
     return json.loads(history_json)
 
 
+def retrieve_history_from_file(filepath: str | Path) -> dict:
+    """
+    Open a NetCDF file and retrieve its history_json field, if it exists
+
+    Parameters
+    ----------
+    filepath: path to a single granule
+
+    Returns
+    -------
+    A history_json field
+    """
+    with netCDF4.Dataset(filepath, "r") as dataset:
+        return retrieve_history(dataset)
+
+
 def construct_history(input_files: list, granule_urls: list) -> dict:
     """
     Construct history JSON entry for this concatenation operation
@@ -245,3 +265,38 @@ def construct_history(input_files: list, granule_urls: list) -> dict:
         "program_ref": PROGRAM_REF,
     }
     return history_json
+
+
+def deduplicate_history(history_json: Iterable) -> list:
+    """
+    Remove repeated history JSON entries, e.g., inherited by several granules from a common ancestor
+
+    Parameters
+    ----------
+    history_json: History JSON entries, e.g., as gathered from the input files
+
+    Returns
+    -------
+    The history JSON entries in their original order, keeping only the first of identical entries
+    """
+    unique_entries: dict = {}
+    for entry in history_json:
+        # Entries are keyed by their canonical (key-sorted) serialization.
+        key = json.dumps(entry, default=str, sort_keys=True)
+        unique_entries.setdefault(key, entry)
+    return list(unique_entries.values())
+
+
+def dumps_history(history_json: list | dict) -> str:
+    """
+    Serialize history JSON entries to a string, for the history_json global attribute
+
+    Parameters
+    ----------
+    history_json: History JSON entries, e.g., as gathered from the input files
+
+    Returns
+    -------
+    The serialized history JSON
+    """
+    return json.dumps(history_json, default=str)
@@ -7,7 +7,9 @@ Functions for converting multidimensional data structures
 
 from __future__ import annotations
 
+import logging
 import re
+from collections.abc import Iterator
 
 import netCDF4 as nc
 import numpy as np
@@ -19,6 +21,8 @@ from concatenator.attribute_handling import (
     regroup_coordinate_attribute,
 )
 
+default_logger = logging.getLogger(__name__)
+
 # Match dimension names such as "__char28" or "__char16". Used for CERES datasets.
 _string_dimension_name_pattern = re.compile(r"__char[0-9]+")
 
@@ -158,7 +162,10 @@ def flatten_grouped_dataset(
 
 
 def regroup_flattened_dataset(
-    dataset: xr.Dataset, output_file: str, history_to_append: str | None
+    dataset: xr.Dataset,
+    output_file: str,
+    history_to_append: str | None,
+    compress: bool = True,
 ) -> None:  # pylint: disable=too-many-branches
     """
     Given a list of xarray datasets, combine those datasets into a
@@ -172,6 +179,11 @@ def regroup_flattened_dataset(
         List of xarray datasets to be combined
     output_file : str
         Name of the output file to write the resulting NetCDF file to.
+    history_to_append : str, optional
+        JSON string to set as the "history_json" global attribute.
+    compress : bool
+        If False, variables are written uncompressed and with contiguous (unchunked) storage,
+        which is faster to write and lets readers access any slice without decompressing chunks.
     """
     with nc.Dataset(output_file, mode="w", format="NETCDF4") as base_dataset:
         # Copy global attributes
@@ -236,12 +248,21 @@ def regroup_flattened_dataset(
                 compression: str | None = "zlib"
                 if vartype.startswith("<U") and len(var.shape) == 1 and var.shape[0] < 10:
                     compression = None
+                # Contiguous storage cannot hold variables with a zero-length dimension,
+                # so those keep the default (chunked) storage, even if uncompressed.
+                contiguous = False
+                if not compress:
+                    compression = None
+                    shuffle = False
+                    chunk_sizes = None
+                    contiguous = 0 not in var.shape
 
                 var_group.createVariable(
                     new_var_name,
                     vartype,
                     dimensions=new_var_dims,
                     chunksizes=chunk_sizes,
+                    contiguous=contiguous,
                     compression=compression,
                     complevel=7,
                     shuffle=shuffle,
@@ -318,7 +339,7 @@ def _get_dimension_size(dataset: nc.Dataset, dim_name: str) -> int:
                 break
 
     if dim_size is None:
-        print(f"Dimension {dim_name} not found when searching for sizes!")
+        default_logger.warning("Dimension %s not found when searching for sizes!", dim_name)
     return dim_size
 
 
@@ -354,27 +375,61 @@ def _is_file_empty(parent_group: nc.Dataset | nc.Group) -> bool:
     -------
     False if the dataset is considered non-empty; True otherwise (dataset is indeed empty).
     """
-    for var_name, var in parent_group.variables.items():
+    for var in _iter_variables(parent_group):
         if var.size != 0:
             if "_FillValue" in var.ncattrs():
                 fill_or_null = getattr(var, "_FillValue")
             else:
                 fill_or_null = np.nan
 
-            # This checks three ways that the variable's array might be considered empty.
-            # If none of the ways are true,
-            #   a non-empty variable has been found and False is returned.
-            # If one of the ways is true, we consider the variable empty,
-            #   and continue checking other variables.
-            empty_way_1 = False
-            if np.ma.isMaskedArray(var[:]):
-                empty_way_1 = var[:].mask.all()
-            empty_way_2 = np.all(var[:].data == fill_or_null)
-            empty_way_3 = np.all(np.isnan(var[:].data))
-
-            if not (empty_way_1 or empty_way_2 or empty_way_3):
+            # The first chunk is checked before reading the whole array:
+            # if any part of the array holds data, the variable cannot be empty.
+            first_chunk = _first_chunk_index(var)
+            if first_chunk is not None and not _is_array_empty(var[first_chunk], fill_or_null):
+                return False  # Found a non-empty variable.
+
+            if not _is_array_empty(var[:], fill_or_null):
                 return False  # Found a non-empty variable.
 
-    for child_group in parent_group.groups.values():
-        return _is_file_empty(child_group)
     return True
+
+
+def _is_array_empty(values: np.ndarray | np.ma.MaskedArray, fill_or_null) -> bool:
+    """Check if an array read from a netCDF variable is empty, i.e., all masked, fill or null."""
+    # This checks three ways that the variable's array might be considered empty.
+    # If none of the ways are true, the array is non-empty.
+    # The checks are evaluated in turn, so that the array is not scanned again once one is true.
+    if isinstance(values, np.ma.MaskedArray) and values.mask.all():
+        return True
+    data = np.ma.getdata(values)
+    if np.all(data == fill_or_null):
+        return True
+    # Only floating point (or complex) arrays can hold NaN values.
+    return bool(np.issubdtype(data.dtype, np.inexact) and np.all(np.isnan(data)))
+
+
+def _first_chunk_index(var: nc.Variable) -> tuple | None:
+    """Index of the first chunk of a variable, or of its first row if it is not chunked.
+
+    None is returned if that would cover the whole variable.
+    """
+    chunking = var.chunking()
+    if isinstance(chunking, list):
+        chunk_shape = tuple(chunking)
+    else:
+        chunk_shape = (1,) * (var.ndim - 1) + var.shape[-1:]
+
+    if all(chunk_size >= dim_size for chunk_size, dim_size in zip(chunk_shape, var.shape)):
+        return None
+    return tuple(slice(0, size) for size in chunk_shape)
+
+
+def _iter_variables(parent_group: nc.Dataset | nc.Group) -> Iterator[nc.Variable]:
+    """Yield the variables of a group, and then those of all of its subgroups."""
+    # An explicit stack is used rather than recursion, so that variables of deeply nested
+    # groups are not passed up through one generator per level.
+    groups_to_visit = [parent_group]
+    while groups_to_visit:
+        group = groups_to_visit.pop()
+        yield from group.variables.values()
+        groups_to_visit.extend(group.groups.values())
@@ -2,7 +2,7 @@
 
 import queue
 import re
-from copy import deepcopy
+from collections.abc import Iterator
 from multiprocessing import Manager, Process
 from os import cpu_count
 from pathlib import Path
@@ -12,14 +12,19 @@ from harmony.logging import build_logger
 from harmony.util import download
 
 
-def multi_core_download(
+def multi_core_download_as_completed(
     urls: list, destination_dir: str, access_token: str, cfg: dict, process_count: int | None = None
-) -> list[Path]:
+) -> Iterator[Path]:
     """
     A method which automagically scales downloads to the number of CPU
     cores. For further explaination, see documentation on "multi-track
     drifting"
 
+    Each downloaded file is yielded as soon as it is available, so that callers
+    can start working on the first granules while the remaining ones are still
+    downloading. If the caller stops iterating early, the remaining downloads
+    are stopped.
+
     Parameters
     ----------
     urls : list
@@ -33,9 +38,9 @@ def multi_core_download(
     process_count : int, optional
         Number of worker processes to run (expected >= 1)
 
-    Returns
-    -------
-    list of downloaded files as pathlib.Path objects
+    Yields
+    ------
+    downloaded files as pathlib.Path objects, in order of completion
     """
 
     if process_count is None:
@@ -45,47 +50,71 @@ def multi_core_download(
 
     with Manager() as manager:
         url_queue = manager.Queue(len(urls))
-        path_list = manager.list()
+        path_queue = manager.Queue()
 
         for url in urls:
             url_queue.put(url)
 
-        # Spawn worker processes
-        processes = []
-        for _ in range(process_count):
-            download_process = Process(
-                target=_download_worker,
-                args=(url_queue, path_list, destination_dir, access_token, cfg),
-            )
-            processes.append(download_process)
-            download_process.start()
-
-        # Ensure worker processes exit successfully
-        for process in processes:
-            process.join()
-            if process.exitcode != 0:
-                raise RuntimeError(f"Download failed - exit code: {process.exitcode}")
-
-            process.close()
-
-        path_list = deepcopy(path_list)  # ensure GC can cleanup multiprocessing
-
-    return [Path(path) for path in path_list]
+        processes: list[Process] = []
+        try:
+            # Spawn worker processes
+            for _ in range(process_count):
+                download_process = Process(
+                    target=_download_worker,
+                    args=(url_queue, path_queue, destination_dir, access_token, cfg),
+                )
+                processes.append(download_process)
+                download_process.start()
+
+            # Hand back completed downloads while the workers are still running
+            remaining = len(urls)
+            while remaining > 0:
+                try:
+                    path = path_queue.get(timeout=1)
+                except queue.Empty:
+                    if any(process.is_alive() for process in processes):
+                        continue
+                    # All workers have exited; only already-queued paths are left.
+                    try:
+                        path = path_queue.get_nowait()
+                    except queue.Empty:
+                        break
+                remaining -= 1
+                yield Path(path)
+
+            # Ensure worker processes exit successfully
+            for process in processes:
+                process.join()
+                if process.exitcode != 0:
+                    raise RuntimeError(f"Download failed - exit code: {process.exitcode}")
+
+        finally:
+            # Workers are stopped before the manager shuts down their queues, e.g., if the
+            # caller stopped iterating early or a download failed.
+            for process in processes:
+                if process.is_alive():
+                    process.terminate()
+                process.join()
+                process.close()
 
 
 def _download_worker(
-    url_queue: queue.Queue, path_list: list, destination_dir: str, access_token: str, cfg: dict
+    url_queue: queue.Queue,
+    path_queue: queue.Queue,
+    destination_dir: str,
+    access_token: str,
+    cfg: dict,
 ) -> None:
     """
     A method to be executed in a separate process which processes the url_queue
-    and places paths to completed downloads into the path_list. Downloads are
+    and places paths to completed downloads into the path_queue. Downloads are
     handled by harmony.util.download
 
     Parameters
     ----------
     url_queue : queue.Queue
         URLs to process - should be filled from start and only decreases
-    path_list : list
+    path_queue : queue.Queue
         paths to completed file downloads
     destination_dir : str
         output path for downloaded files
@@ -115,4 +144,4 @@ def _download_worker(
         else:
             logger.warning("Origin filename could not be assertained - %s", url)
 
-        path_list.append(str(path))
+        path_queue.put(str(path))
@@ -1,25 +1,26 @@
-import json
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 from pathlib import Path
 from shutil import copyfile
 from tempfile import TemporaryDirectory
 from urllib.parse import urlsplit
 from uuid import uuid4
 
-import netCDF4 as nc
 import pystac
 from harmony.adapter import BaseHarmonyAdapter
 from harmony.util import bbox_to_geometry, stage
 from pystac import Item
 from pystac.item import Asset
 
-from concatenator.attribute_handling import construct_history, retrieve_history
-from concatenator.harmony.download_worker import multi_core_download
-from concatenator.harmony.util import (
-    _get_netcdf_urls,
-    _get_output_bounding_box,
-    _get_output_date_range,
-    sizeof_fmt,
+from concatenator.attribute_handling import (
+    construct_history,
+    deduplicate_history,
+    dumps_history,
+    retrieve_history_from_file,
 )
+from concatenator.harmony.download_worker import multi_core_download_as_completed
+from concatenator.harmony.util import _summarize_items, sizeof_fmt
 from concatenator.stitchee import stitchee
 
 
@@ -62,32 +63,25 @@ class StitcheeAdapter(BaseHarmonyAdapter):
         self.logger.info("process_catalog() started.")
         try:
             result = catalog.clone()
-            result.id = str(uuid4())
+            result.id = uuid4().hex
             result.clear_children()
 
-            # Get all the items from the catalog, including from child or linked catalogs
-            items = list(self.get_all_catalog_items(catalog))
+            # Get all the items from the catalog, including from child or linked catalogs,
+            # and summarize them in a single pass without materializing the item list
+            first_item, netcdf_urls, bounding_box, datetimes = _summarize_items(
+                self.get_all_catalog_items(catalog)
+            )
 
-            self.logger.info(f"length of items==={len(items)}.")
+            self.logger.info(f"length of items==={len(netcdf_urls)}.")
 
             # Quick return if catalog contains no items
-            if len(items) == 0:
+            if first_item is None:
                 return result
 
-            # # --- Get granule filepaths (urls) ---
-            netcdf_urls: list[str] = _get_netcdf_urls(items)
             self.logger.info(f"netcdf_urls==={netcdf_urls}.")
 
-            # -- Process metadata --
-            bounding_box: list | None = _get_output_bounding_box(items)
-            datetimes = _get_output_date_range(items)
-
-            # Items did not have a bbox; valid under spec
-            if bounding_box and len(bounding_box) == 0:
-                bounding_box = None
-
             # -- Perform merging --
-            collection = self._get_item_source(items[0]).collection
+            collection = self._get_item_source(first_item).collection
 
             number_of_granules = len(netcdf_urls)
             first_url_name = Path(netcdf_urls[0]).stem
@@ -96,29 +90,46 @@ class StitcheeAdapter(BaseHarmonyAdapter):
 
             with TemporaryDirectory() as temp_dir:
                 self.logger.info("Starting granule downloads")
-                input_files = multi_core_download(
-                    netcdf_urls, temp_dir, self.message.accessToken, self.config
-                )
-                self.logger.info("Finished granule downloads.")
-
-                history_json: list[dict] = []
-                for file_count, file in enumerate(input_files):
-                    file_size = sizeof_fmt(file.stat().st_size)
-                    self.logger.info(f"File {file_count} is size <{file_size}>. Path={file}")
-
-                    with nc.Dataset(file, "r") as dataset:
-                        history_json.extend(retrieve_history(dataset))
+                input_files: list[str] = []
+                # History is read from each granule as soon as its download completes,
+                # overlapping with the remaining downloads. A single reader thread is used
+                # because the netCDF-C library is not thread-safe.
+                with ThreadPoolExecutor(max_workers=1) as history_executor:
+                    history_futures = []
+                    for file_count, file in enumerate(
+                        multi_core_download_as_completed(
+                            netcdf_urls, temp_dir, self.message.accessToken, self.config
+                        )
+                    ):
+                        self.logger.debug("Downloaded file %d. Path=%s", file_count, file)
+
+                        input_files.append(str(file))
+                        history_futures.append(
+                            history_executor.submit(retrieve_history_from_file, file)
+                        )
+                    file_sizes = [
+                        entry.stat().st_size for entry in os.scandir(temp_dir) if entry.is_file()
+                    ]
+                    self.logger.info(
+                        "Finished granule downloads: %d files totalling <%s>.",
+                        len(file_sizes),
+                        sizeof_fmt(sum(file_sizes)),
+                    )
+
+                    history_json: list[dict] = deduplicate_history(
+                        chain.from_iterable(future.result() for future in history_futures)
+                    )
 
                 history_json.append(construct_history(input_files, netcdf_urls))
 
-                new_history_json = json.dumps(history_json, default=str)
+                new_history_json = dumps_history(history_json)
 
                 self.logger.info("Running Stitchee..")
                 output_path = str(Path(temp_dir).joinpath(filename).resolve())
 
                 # # --- Run STITCHEE ---
                 stitchee(
-                    [str(f) for f in input_files],
+                    input_files,
                     output_path,
                     write_tmp_flat_concatenated=False,
                     keep_tmp_files=False,
@@ -136,9 +147,7 @@ class StitcheeAdapter(BaseHarmonyAdapter):
                 start_datetime=datetimes["start_datetime"], end_datetime=datetimes["end_datetime"]
             )
 
-            item = Item(
-                str(uuid4()), bbox_to_geometry(bounding_box), bounding_box, None, properties
-            )
+            item = Item(uuid4().hex, bbox_to_geometry(bounding_box), bounding_box, None, properties)
             asset = Asset(
                 staged_url, title=filename, media_type="application/x-netcdf4", roles=["data"]
             )
@@ -156,9 +165,9 @@ class StitcheeAdapter(BaseHarmonyAdapter):
     def _stage(self, local_filename: str, remote_filename: str, mime: str) -> str:
         """
         Stages a local file to either to S3 (utilizing harmony.util.stage) or to
-        the local filesystem by performing a file copy. Staging location is
-        determined by message.stagingLocation or the --harmony-data-location
-        CLI argument override
+        the local filesystem by creating a hard link (falling back to a file copy
+        across filesystems). Staging location is determined by
+        message.stagingLocation or the --harmony-data-location CLI argument override
 
         Parameters
         ----------
@@ -181,7 +190,11 @@ class StitcheeAdapter(BaseHarmonyAdapter):
             dest_path = Path(url_components.path).joinpath(remote_filename)
             self.logger.info("Staging to local filesystem: '%s'", str(dest_path))
 
-            copyfile(local_filename, dest_path)
+            # A hard link avoids copying the data when both paths share a filesystem.
+            try:
+                os.link(local_filename, dest_path)
+            except OSError:
+                copyfile(local_filename, dest_path)
             return dest_path.as_uri()
 
         return stage(
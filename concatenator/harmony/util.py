@@ -1,4 +1,5 @@
 """Misc utility functions"""
+from collections.abc import Iterable
 from datetime import datetime
 
 from pystac import Asset, Item
@@ -33,55 +34,71 @@ def _get_item_url(item: Item) -> str | None:
     )
 
 
-def _get_netcdf_urls(items: list[Item]) -> list[str]:
-    """Iterate through a list of `pystac.Item` instances, from the input
-    `pystac.Catalog`. Extract the `pystac.Asset.href` for the first asset
-    of each item that has a role of "data". If there are any items that do
-    not have a data asset, then raise an exception.
-
-    """
-    catalog_urls = [_get_item_url(item) for item in items]
-
-    if None in catalog_urls:
-        raise RuntimeError("Some input granules do not have NetCDF-4 assets.")
-
-    return catalog_urls  # type: ignore[return-value]
+def _summarize_items(
+    input_items: Iterable[Item],
+) -> tuple[Item | None, list[str], list[float] | None, dict[str, str | None]]:
+    """Make a single pass over `pystac.Item` instances, which may be a lazy
+    iterator, and gather everything needed for the merged output:
 
+    - the first item;
+    - the `pystac.Asset.href` of the first NetCDF-4 asset with a role of
+      "data" for each item. If any item has no such asset, raise an exception;
+    - the bounding box of the maximum combined extent of all item bounding
+      boxes, ignoring items without one, or None if no item has one;
+    - the start and end datetime of the full temporal range of all items,
+      ignoring open-ended bounds. This will be used for the `properties` of
+      the output `pystac.Item`.
 
-def _get_output_bounding_box(input_items: list[Item]) -> list[float]:
-    """Create a bounding box that is the maximum combined extent of all input
-    `pystac.Item` bounding box extents.
+    If there are no items, the first item is None and the date range is empty.
 
     """
-    bounding_box = input_items[0].bbox
+    first_item = None
+    netcdf_urls = []
+    bounding_box: list[float] | None = None
+    start_datetime: datetime | None = None
+    end_datetime: datetime | None = None
 
     for item in input_items:
-        bounding_box[0] = min(bounding_box[0], item.bbox[0])
-        bounding_box[1] = min(bounding_box[1], item.bbox[1])
-        bounding_box[2] = max(bounding_box[2], item.bbox[2])
-        bounding_box[3] = max(bounding_box[3], item.bbox[3])
-
-    return bounding_box
-
-
-def _get_output_date_range(input_items: list[Item]) -> dict[str, str]:
-    """Create a dictionary of start and end datetime, which encompasses the
-    full temporal range of all input `pystac.Item` instances. This output
-    dictionary will be used for the `properties` of the output Zarr store
-    `pystac.Item`.
+        if first_item is None:
+            first_item = item
+
+        item_url = _get_item_url(item)
+        if item_url is None:
+            raise RuntimeError("Some input granules do not have NetCDF-4 assets.")
+        netcdf_urls.append(item_url)
+
+        if item.bbox:
+            if bounding_box is None:
+                bounding_box = list(item.bbox)
+            else:
+                bounding_box[0] = min(bounding_box[0], item.bbox[0])
+                bounding_box[1] = min(bounding_box[1], item.bbox[1])
+                bounding_box[2] = max(bounding_box[2], item.bbox[2])
+                bounding_box[3] = max(bounding_box[3], item.bbox[3])
 
-    """
-    start_datetime, end_datetime = _get_item_date_range(input_items[0])
-
-    for item in input_items:
         new_start_datetime, new_end_datetime = _get_item_date_range(item)
-        start_datetime = min(start_datetime, new_start_datetime)
-        end_datetime = max(end_datetime, new_end_datetime)
-
-    return {"start_datetime": start_datetime.isoformat(), "end_datetime": end_datetime.isoformat()}
-
-
-def _get_item_date_range(item: Item) -> tuple[datetime, datetime]:
+        if new_start_datetime is not None:
+            start_datetime = (
+                new_start_datetime
+                if start_datetime is None
+                else min(start_datetime, new_start_datetime)
+            )
+        if new_end_datetime is not None:
+            end_datetime = (
+                new_end_datetime if end_datetime is None else max(end_datetime, new_end_datetime)
+            )
+
+    date_range: dict[str, str | None] = {}
+    if first_item is not None:
+        date_range = {
+            "start_datetime": start_datetime.isoformat() if start_datetime else None,
+            "end_datetime": end_datetime.isoformat() if end_datetime else None,
+        }
+
+    return first_item, netcdf_urls, bounding_box, date_range
+
+
+def _get_item_date_range(item: Item) -> tuple[datetime | None, datetime | None]:
     """A helper function to retrieve the temporal range from a `pystac.Item`
     instance. If the `pystac.Item.datetime` property exists, there is a
     single datetime associated with the granule, otherwise there will be a
@@ -1,5 +1,6 @@
 """A simple CLI wrapper around the main concatenation process."""
 
+import hashlib
 import json
 import logging
 import os
@@ -7,16 +8,21 @@ import shutil
 import sys
 import uuid
 from argparse import ArgumentParser
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, partial
+from itertools import chain
 from pathlib import Path
 
-import netCDF4 as nc
-
-from concatenator.attribute_handling import construct_history, retrieve_history
 from concatenator.file_ops import add_label_to_path
-from concatenator.stitchee import stitchee
+
+# Maximum number of parsed histories kept in the on-disk cache; the oldest are removed first.
+HISTORY_CACHE_MAX_ENTRIES = 4096
 
 
-def parse_args(args: list) -> tuple[list[str], str, str, bool, str | None, str, dict]:
+def parse_args(
+    args: list,
+) -> tuple[list[str], str, str, bool, str | None, str, dict, bool, bool, bool]:
     """
     Parse args for this script.
 
@@ -24,6 +30,69 @@ def parse_args(args: list) -> tuple[list[str], str, str, bool, str | None, str,
     -------
     tuple
     """
+    parser = _build_parser()
+    parsed = parser.parse_args(args)
+
+    if parsed.verbose:
+        logging.basicConfig(level=logging.DEBUG)
+
+    # Temporary input copies get new paths on every run, so their histories would never be reused.
+    if parsed.history_cache and not (parsed.no_input_file_copies or parsed.in_memory_input_copies):
+        raise ValueError(
+            "'--history_cache' can only be used with '--no_input_file_copies' or "
+            "'--in_memory_input_copies'."
+        )
+
+    # Validate the input and output paths
+    output_path = _validate_output_path(parsed)
+    input_files = _validate_input_path(parsed)
+
+    logging.debug("CONCAT METHOD === %s", parsed.concat_method)
+    logging.debug("CONCAT DIM === %s", parsed.concat_dim)
+    if parsed.concat_method == "xarray-concat":
+        if not parsed.concat_dim:
+            raise ValueError(
+                "If using the xarray-concat method, then 'concat_dim' must be specified."
+            )
+    elif parsed.concat_method == "xarray-combine":
+        if parsed.concat_dim:
+            raise ValueError(
+                "If using the xarray-combine method, then 'concat_dim' cannot be specified."
+            )
+
+    # Gather the concatenation arguments that will be passed to xarray.
+    concat_kwargs = {}
+    if parsed.xarray_arg_compat:
+        concat_kwargs["compat"] = parsed.xarray_arg_compat
+    if parsed.xarray_arg_combine_attrs:
+        concat_kwargs["combine_attrs"] = parsed.xarray_arg_combine_attrs
+    if parsed.xarray_arg_join:
+        concat_kwargs["join"] = parsed.xarray_arg_join
+
+    # If requested, make a temporary directory with new copies of the original input files
+    temporary_dir_to_remove = None
+    if not (parsed.no_input_file_copies or parsed.in_memory_input_copies):
+        input_files, temporary_dir_to_remove = _make_temp_dir_with_input_file_copies(
+            input_files, output_path
+        )
+
+    return (
+        input_files,
+        str(output_path),
+        parsed.concat_dim,
+        bool(parsed.keep_tmp_files),
+        temporary_dir_to_remove,
+        parsed.concat_method,
+        concat_kwargs,
+        bool(parsed.history_cache),
+        bool(parsed.in_memory_input_copies),
+        not parsed.no_output_compression,
+    )
+
+
+@cache
+def _build_parser() -> ArgumentParser:
+    # The parser is built once per process and reused, e.g., when invoked repeatedly in-process.
     parser = ArgumentParser(
         prog="stitchee", description="Run the along-existing-dimension concatenator."
     )
@@ -54,6 +123,13 @@ def parse_args(args: list) -> tuple[list[str], str, str, bool, str | None, str,
         "of input files. This is useful for testing, but uses more disk space.  "
         "By specifying this argument, no copying is performed.",
     )
+    parser.add_argument(
+        "--in_memory_input_copies",
+        action="store_true",
+        help="Instead of copying input files into a temporary directory, open each input file "
+        "as an in-memory copy, so that input files are not modified and no copies are written "
+        "to disk. This uses more memory.",
+    )
     parser.add_argument(
         "--keep_tmp_files",
         action="store_true",
@@ -84,6 +160,19 @@ def parse_args(args: list) -> tuple[list[str], str, str, bool, str | None, str,
         "--xarray_arg_join",
         help="'join' argument passed to xarray.concat() or xarray.combine_by_coords().",
     )
+    parser.add_argument(
+        "--no_output_compression",
+        action="store_true",
+        help="Write the output variables uncompressed and with contiguous (unchunked) storage. "
+        "This is faster to write and to read back, but produces a larger file.",
+    )
+    parser.add_argument(
+        "--history_cache",
+        action="store_true",
+        help="Cache the parsed history of each input file on disk (in $XDG_CACHE_HOME/stitchee), "
+        "keyed by the file's absolute path, inode, modification time and size, to speed up reruns "
+        "on the same inputs. Requires '--no_input_file_copies' or '--in_memory_input_copies'.",
+    )
     parser.add_argument(
         "-O", "--overwrite", action="store_true", help="Overwrite output file if it already exists."
     )
@@ -94,100 +183,94 @@ def parse_args(args: list) -> tuple[list[str], str, str, bool, str | None, str,
         action="store_true",
     )
 
-    parsed = parser.parse_args(args)
-
-    if parsed.verbose:
-        logging.basicConfig(level=logging.DEBUG)
-
-    # Validate the input and output paths
-    output_path = _validate_output_path(parsed)
-    input_files = _validate_input_path(parsed)
-
-    print(f"CONCAT METHOD === {parsed.concat_method}")
-    print(f"CONCAT DIM === {parsed.concat_dim}")
-    if parsed.concat_method == "xarray-concat":
-        if not parsed.concat_dim:
-            raise ValueError(
-                "If using the xarray-concat method, then 'concat_dim' must be specified."
-            )
-    elif parsed.concat_method == "xarray-combine":
-        if parsed.concat_dim:
-            raise ValueError(
-                "If using the xarray-combine method, then 'concat_dim' cannot be specified."
-            )
-
-    # Gather the concatenation arguments that will be passed to xarray.
-    concat_kwargs = {}
-    if parsed.xarray_arg_compat:
-        concat_kwargs["compat"] = parsed.xarray_arg_compat
-    if parsed.xarray_arg_combine_attrs:
-        concat_kwargs["combine_attrs"] = parsed.xarray_arg_combine_attrs
-    if parsed.xarray_arg_join:
-        concat_kwargs["join"] = parsed.xarray_arg_join
-
-    # If requested, make a temporary directory with new copies of the original input files
-    temporary_dir_to_remove = None
-    if not parsed.no_input_file_copies:
-        input_files, temporary_dir_to_remove = _make_temp_dir_with_input_file_copies(
-            input_files, output_path
-        )
-
-    return (
-        input_files,
-        str(output_path),
-        parsed.concat_dim,
-        bool(parsed.keep_tmp_files),
-        temporary_dir_to_remove,
-        parsed.concat_method,
-        concat_kwargs,
-    )
+    return parser
 
 
 def _make_temp_dir_with_input_file_copies(input_files, output_path):
     new_data_dir = Path(
-        add_label_to_path(str(output_path.parent / "temp_copy"), label=str(uuid.uuid4()))
+        add_label_to_path(str(output_path.parent / "temp_copy"), label=uuid.uuid4().hex)
     ).resolve()
     os.makedirs(new_data_dir, exist_ok=True)
-    print("Created temporary directory: %s", str(new_data_dir))
+    logging.debug("Created temporary directory: %s", new_data_dir)
 
-    new_input_files = []
-    for file in input_files:
-        new_path = new_data_dir / Path(file).name
-        shutil.copyfile(file, new_path)
-        new_input_files.append(str(new_path))
+    # Files are copied concurrently, keeping the order of the input files.
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        input_files = list(
+            executor.map(partial(_copy_input_file, dest_dir=new_data_dir), input_files)
+        )
 
-    input_files = new_input_files
-    print("Copied files to temporary directory: %s", new_data_dir)
+    logging.debug("Copied files to temporary directory: %s", new_data_dir)
     temporary_dir_to_remove = str(new_data_dir)
 
     return input_files, temporary_dir_to_remove
 
 
+def _copy_input_file(file: str, dest_dir: Path) -> str:
+    new_path = dest_dir / Path(file).name
+    _copy_file(file, new_path)
+    return str(new_path)
+
+
+def _copy_file(src: str, dst: str | Path) -> None:
+    try:
+        # copy_file_range lets the kernel (or filesystem, e.g., via reflinks) do the copy.
+        _copy_file_range(src, dst)
+    except OSError:
+        shutil.copyfile(src, dst)
+
+
+def _copy_file_range(src: str, dst: str | Path) -> None:
+    if not hasattr(os, "copy_file_range"):
+        raise OSError("os.copy_file_range is not available on this platform.")
+
+    with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+        # The source is read once from start to end, and only the copy is used afterwards,
+        # so the kernel can read ahead aggressively and then drop the source from the page cache.
+        os.posix_fadvise(fsrc.fileno(), 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        file_size = os.fstat(fsrc.fileno()).st_size
+        remaining = file_size
+        while remaining > 0:
+            copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+        os.posix_fadvise(fsrc.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+    # Some filesystems (e.g., FUSE or overlay) report no progress before the end of the file,
+    # in which case the copy is incomplete, and the caller falls back to a regular copy.
+    if remaining > 0:
+        raise OSError(
+            f"os.copy_file_range copied {file_size - remaining} of {file_size} bytes of <{src}>."
+        )
+
+
 def _validate_output_path(parsed):
     # The output file path is validated.
-    output_path = Path(parsed.output_path).resolve()
-    if output_path.is_file():  # the file already exists
+    # Only existence checks are needed, so avoid resolving symlinks on every path component.
+    output_path = Path(os.path.abspath(parsed.output_path))
+    if os.path.isfile(output_path):  # the file already exists
         if parsed.overwrite:
             os.remove(output_path)
         else:
             raise FileExistsError(
                 f"File already exists at <{output_path}>. Run again with option '-O' to overwrite."
             )
-    if output_path.is_dir():  # the specified path is an existing directory
+    if os.path.isdir(output_path):  # the specified path is an existing directory
         raise TypeError("Output path cannot be a directory. Please specify a new filepath.")
     return output_path
 
 
 def _validate_input_path(parsed):
     # The input directory or file is validated.
-    print(f"parsed_input === {parsed.input}")
+    logging.debug("parsed_input === %s", parsed.input)
     if len(parsed.input) > 1:
         input_files = parsed.input
     elif len(parsed.input) == 1:
-        directory_or_path = Path(parsed.input[0]).resolve()
-        if directory_or_path.is_dir():
+        # Only the path type is needed, so symlinks are not resolved here.
+        directory_or_path = Path(os.path.abspath(parsed.input[0]))
+        if os.path.isdir(directory_or_path):
             input_files = _get_list_of_filepaths_from_dir(directory_or_path)
-        elif directory_or_path.is_file():
+        elif os.path.isfile(directory_or_path):
             input_files = _get_list_of_filepaths_from_file(directory_or_path)
         else:
             raise TypeError(
@@ -200,21 +283,98 @@ def _validate_input_path(parsed):
 
 
 def _get_list_of_filepaths_from_file(file_with_paths: Path):
-    # Each path listed in the specified file is resolved using pathlib for validation.
-    paths_list = []
+    # Each path listed in the specified file is made absolute; blank lines are ignored.
+    # os.path.abspath is purely lexical, so no symlinks are resolved for each listed path.
     with open(file_with_paths, encoding="utf-8") as file:
-        while line := file.readline():
-            paths_list.append(str(Path(line.rstrip()).resolve()))
+        lines = file.read().splitlines()
 
-    return paths_list
+    return [os.path.abspath(line.strip()) for line in lines if line.strip()]
 
 
 def _get_list_of_filepaths_from_dir(data_dir: Path):
     # Get a list of files (ignoring hidden files) in directory.
-    input_files = [str(f) for f in data_dir.iterdir() if not f.name.startswith(".")]
+    # os.scandir provides the entry type from the directory listing, avoiding a stat per entry.
+    with os.scandir(data_dir) as entries:
+        input_files = [
+            entry.path for entry in entries if not entry.name.startswith(".") and entry.is_file()
+        ]
     return input_files
 
 
+def _gather_history(input_files: list[str], cache_dir: Path | None = None) -> list[dict]:
+    from concatenator.attribute_handling import retrieve_history_from_file
+
+    # History attributes are gathered in the order of the input files.
+    retrieve: Callable[[str], list | dict]
+    if cache_dir is None:
+        retrieve = retrieve_history_from_file
+    else:
+        retrieve = partial(_retrieve_history_with_cache, cache_dir=cache_dir)
+
+    return list(chain.from_iterable(map(retrieve, input_files)))
+
+
+def _get_history_cache_dir() -> Path:
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "stitchee" / "history"
+
+
+def _retrieve_history_with_cache(filepath: str, cache_dir: Path) -> list | dict:
+    from concatenator.attribute_handling import retrieve_history_from_file
+
+    # The parsed history is memoized on disk, keyed by the file's absolute path and identity,
+    # so that an entry is no longer used once the file is replaced or modified.
+    file_stat = os.stat(filepath)
+    cache_key = hashlib.blake2b(
+        f"{os.path.abspath(filepath)}|{file_stat.st_dev}|{file_stat.st_ino}|"
+        f"{file_stat.st_mtime_ns}|{file_stat.st_size}".encode(),
+        digest_size=16,
+    ).hexdigest()
+    cache_file = cache_dir / f"{cache_key}.json"
+
+    try:
+        with open(cache_file, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        pass
+
+    history = retrieve_history_from_file(filepath)
+
+    # The cache file is written atomically, so concurrent runs never read a partial file.
+    tmp_cache_file = cache_file.with_suffix(f".{uuid.uuid4().hex}.tmp")
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        with open(tmp_cache_file, "w", encoding="utf-8") as file:
+            json.dump(history, file)
+        os.replace(tmp_cache_file, cache_file)
+    except OSError as err:
+        logging.debug("Could not write history cache file <%s>: %s", cache_file, err)
+        tmp_cache_file.unlink(missing_ok=True)
+
+    return history
+
+
+def _prune_history_cache(cache_dir: Path, max_entries: int = HISTORY_CACHE_MAX_ENTRIES) -> None:
+    # The least recently written entries are removed, so that the cache does not grow unbounded.
+    try:
+        with os.scandir(cache_dir) as entries:
+            cache_files = [
+                entry for entry in entries if entry.name.endswith(".json") and entry.is_file()
+            ]
+    except OSError:
+        return
+
+    if len(cache_files) <= max_entries:
+        return
+
+    cache_files.sort(key=lambda entry: entry.stat().st_mtime_ns)
+    for entry in cache_files[: len(cache_files) - max_entries]:
+        try:
+            os.remove(entry.path)
+        except OSError as err:
+            logging.debug("Could not remove history cache file <%s>: %s", entry.path, err)
+
+
 def run_stitchee(args: list) -> None:
     """
     Parse arguments and run subsetter on the specified input file
@@ -227,17 +387,28 @@ def run_stitchee(args: list) -> None:
         temporary_dir_to_remove,
         concat_method,
         concat_kwargs,
+        history_cache,
+        in_memory_input_copies,
+        compress_output,
     ) = parse_args(args)
     num_inputs = len(input_files)
 
-    history_json: list[dict] = []
-    for file_count, file in enumerate(input_files):
-        with nc.Dataset(file, "r") as dataset:
-            history_json.extend(retrieve_history(dataset))
+    # Heavy dependencies (e.g., netCDF4 and xarray) are only imported once the arguments
+    # have been parsed, so that '--help' and argument errors return quickly.
+    from concatenator.attribute_handling import (
+        construct_history,
+        deduplicate_history,
+        dumps_history,
+    )
+    from concatenator.stitchee import stitchee
 
+    history_cache_dir = _get_history_cache_dir() if history_cache else None
+    history_json = deduplicate_history(_gather_history(input_files, history_cache_dir))
+    if history_cache_dir is not None:
+        _prune_history_cache(history_cache_dir)
     history_json.append(construct_history(input_files, input_files))
 
-    new_history_json = json.dumps(history_json, default=str)
+    new_history_json = dumps_history(history_json)
 
     logging.info("Executing stitchee concatenation on %d files...", num_inputs)
     stitchee(
@@ -249,6 +420,8 @@ def run_stitchee(args: list) -> None:
         concat_dim=concat_dim,
         concat_kwargs=concat_kwargs,
         history_to_append=new_history_json,
+        open_inputs_in_memory=in_memory_input_copies,
+        compress_output=compress_output,
     )
     logging.info("STITCHEE complete. Result in %s", output_path)
 
@@ -23,15 +23,6 @@ from concatenator.file_ops import add_label_to_path
 
 default_logger = logging.getLogger(__name__)
 
-# class netcdfExitStack(ExitStack):
-#     """A context manager that handles netCDF.Dataset.close exceptions."""
-#     def __exit__(self, *args, logger=default_logger, **kwargs):
-#         try:
-#             super().__exit__(*args, **kwargs)
-#         except RuntimeError as err:
-#             if str(err) == "NetCDF: Not a valid ID":
-#                 logger.warning("Tried closing an already closed netCDF.")
-
 
 def stitchee(
     files_to_concat: list[str],
@@ -42,6 +33,9 @@ def stitchee(
     concat_dim: str = "",
     concat_kwargs: dict | None = None,
     history_to_append: str | None = None,
+    open_inputs_in_memory: bool = False,
+    trust_inputs: bool = False,
+    compress_output: bool = True,
     logger: Logger = default_logger,
 ) -> str:
     """Concatenate netCDF data files along an existing dimension.
@@ -56,17 +50,28 @@ def stitchee(
     concat_dim : str, optional
     concat_kwargs
     history_to_append
+    open_inputs_in_memory : bool
+        Open each input file as an in-memory copy, so that flattening does not modify the files.
+    trust_inputs : bool
+        Skip checking that each input file can be opened and is not empty, e.g., for granules
+        that are known to come from the same processor with the same schema. Variables (and, for
+        xarray-concat, indexes) outside the concatenation dimension are then also taken from the
+        first file, unless 'compat' or 'join' are given in concat_kwargs.
+    compress_output : bool
+        If False, the output variables are written uncompressed and unchunked.
     logger : logging.Logger
 
     Returns
     -------
     str
     """
-    intermediate_flat_filepaths: list[str] = []
     benchmark_log = {"flattening": 0.0, "concatenating": 0.0, "reconstructing_groups": 0.0}
 
     # Proceed to concatenate only files that are workable (can be opened and are not empty).
-    input_files, num_input_files = validate_workable_files(files_to_concat, logger)
+    if trust_inputs:
+        input_files, num_input_files = list(files_to_concat), len(files_to_concat)
+    else:
+        input_files, num_input_files = validate_workable_files(files_to_concat, logger)
 
     # Exit cleanly if no workable netCDF files found.
     if num_input_files < 1:
@@ -79,6 +84,9 @@ def stitchee(
             "selected."
         )
 
+    # Name of the concatenation dimension once input files have been flattened.
+    flat_concat_dim = GROUP_DELIM + concat_dim
+
     try:
         # Instead of "with nc.Dataset() as" inside the loop, we use a context manager stack.
         # This way all files are cleanly closed outside the loop.
@@ -89,10 +97,12 @@ def stitchee(
             concat_dim_order = []
             for i, filepath in enumerate(input_files):
                 # The group structure is flattened.
-                start_time = time.time()
+                start_time = time.perf_counter()
                 logger.info("    ..file %03d/%03d <%s>..", i + 1, num_input_files, filepath)
 
-                ncfile = context_stack.enter_context(nc.Dataset(filepath, "r+"))
+                ncfile = context_stack.enter_context(
+                    nc.Dataset(filepath, "r+", diskless=open_inputs_in_memory)
+                )
 
                 flat_dataset, coord_vars, _ = flatten_grouped_dataset(
                     ncfile, ensure_all_dims_are_coords=True
@@ -102,22 +112,22 @@ def stitchee(
                 flat_dataset = remove_duplicate_dims(flat_dataset)
 
                 logger.info("Opening flattened file with xarray.")
+                # Variables are backed by dask (one chunk per variable and file), so that
+                # concatenation only builds a graph and each output variable is read when written.
                 xrds = xr.open_dataset(
                     xr.backends.NetCDF4DataStore(flat_dataset),
                     decode_times=False,
                     decode_coords=False,
                     drop_variables=coord_vars,
+                    chunks={},
                 )
-                first_value = xrds[GROUP_DELIM + concat_dim].values.flatten()[0]
+                # Only the first element is indexed, so that the backend reads a single value
+                # rather than loading (and copying) the whole variable.
+                sort_variable = xrds[flat_concat_dim]
+                first_value = sort_variable[(0,) * sort_variable.ndim].values.item()
                 concat_dim_order.append(first_value)
 
-                benchmark_log["flattening"] = time.time() - start_time
-
-                # The flattened file is written to disk.
-                # flat_file_path = add_label_to_path(filepath, label="_flat_intermediate")
-                # xrds.to_netcdf(flat_file_path, encoding={v_name: {'dtype': 'str'} for v_name in string_vars})
-                # intermediate_flat_filepaths.append(flat_file_path)
-                # xrdataset_list.append(xr.open_dataset(flat_file_path))
+                benchmark_log["flattening"] += time.perf_counter() - start_time
                 xrdataset_list.append(xrds)
 
             # Reorder the xarray datasets according to the concat dim values.
@@ -127,37 +137,44 @@ def stitchee(
             ]
 
             # Flattened files are concatenated together (Using XARRAY).
-            start_time = time.time()
+            start_time = time.perf_counter()
             logger.info("Concatenating flattened files...")
-            # combined_ds = xr.open_mfdataset(intermediate_flat_filepaths,
-            #                                 decode_times=False,
-            #                                 decode_coords=False,
-            #                                 data_vars='minimal',
-            #                                 coords='minimal',
-            #                                 compat='override')
-
             if concat_kwargs is None:
                 concat_kwargs = {}
 
+            # Trusted inputs are assumed to agree outside the concatenation dimension, so variables
+            # that are not concatenated are taken from the first file (compat="override") and, for
+            # xarray-concat, indexes are taken as-is (join="override"), instead of being compared
+            # across files. Otherwise, variables are compared and indexes are outer-joined.
+            # These are passed explicitly, since xarray's own defaults are changing to
+            # compat="override" and join="exact". Either can be set via concat_kwargs.
             if concat_method == "xarray-concat":
+                if trust_inputs:
+                    default_kwargs = {"compat": "override", "join": "override"}
+                else:
+                    default_kwargs = {"compat": "equals", "join": "outer"}
                 combined_ds = xr.concat(
                     xrdataset_list,
-                    dim=GROUP_DELIM + concat_dim,
+                    dim=flat_concat_dim,
                     data_vars="minimal",
                     coords="minimal",
-                    **concat_kwargs,
+                    **{**default_kwargs, **concat_kwargs},
                 )
             elif concat_method == "xarray-combine":
+                if trust_inputs:
+                    default_kwargs = {"compat": "override", "join": "outer"}
+                else:
+                    default_kwargs = {"compat": "no_conflicts", "join": "outer"}
                 combined_ds = xr.combine_by_coords(
                     xrdataset_list,
                     data_vars="minimal",
                     coords="minimal",
-                    **concat_kwargs,
+                    **{**default_kwargs, **concat_kwargs},
                 )
             else:
                 raise ValueError(f"Unexpected concatenation method, <{concat_method}>.")
 
-            benchmark_log["concatenating"] = time.time() - start_time
+            benchmark_log["concatenating"] = time.perf_counter() - start_time
 
             if write_tmp_flat_concatenated:
                 logger.info("Writing concatenated flattened temporary file to disk...")
@@ -169,13 +186,16 @@ def stitchee(
             else:
                 tmp_flat_concatenated_path = None
 
-            # new_global_attributes = create_new_attributes(combined_ds, request_parameters=dict())
-
             # The group hierarchy of the concatenated file is reconstructed (using XARRAY).
-            start_time = time.time()
+            start_time = time.perf_counter()
             logger.info("Reconstructing groups within concatenated file...")
-            regroup_flattened_dataset(combined_ds, output_file, history_to_append)
-            benchmark_log["reconstructing_groups"] = time.time() - start_time
+            regroup_flattened_dataset(
+                combined_ds,
+                output_file,
+                history_to_append,
+                compress=compress_output,
+            )
+            benchmark_log["reconstructing_groups"] = time.perf_counter() - start_time
 
             logger.info("--- Benchmark results ---")
             total_time = 0.0
@@ -185,11 +205,8 @@ def stitchee(
             logger.info("-- total processing time: %f", total_time)
 
             # If requested, remove temporary intermediate files.
-            if not keep_tmp_files:
-                for file in intermediate_flat_filepaths:
-                    os.remove(file)
-                if tmp_flat_concatenated_path:
-                    os.remove(tmp_flat_concatenated_path)
+            if not keep_tmp_files and tmp_flat_concatenated_path:
+                os.remove(tmp_flat_concatenated_path)
 
     except Exception as err:
         logger.info("Stitchee encountered an error!")
@@ -1,8 +1,17 @@
 import json
+from datetime import datetime, timezone
 
+import netCDF4 as nc
+import numpy as np
 import xarray as xr
 
-from concatenator.attribute_handling import construct_history
+from concatenator.attribute_handling import (
+    construct_history,
+    deduplicate_history,
+    dumps_history,
+    retrieve_history,
+    retrieve_history_from_file,
+)
 from concatenator.stitchee import stitchee
 
 from .conftest import prep_input_files
@@ -38,3 +47,42 @@ def test_simple_sample_with_history(
     # Assert that the history created by this service is the only
     # line present in the history.
     assert "\n" not in stitcheed_dataset.attrs["history_json"]
+
+
+def test_retrieve_history_from_file_matches_netcdf4(ds_3dims_3vars_4coords_1group_part1):
+    history_json = [construct_history(["a.nc"], ["https://example.com/a.nc"])]
+    with nc.Dataset(ds_3dims_3vars_4coords_1group_part1, "r+") as ds:
+        ds.setncattr("history_json", json.dumps(history_json))
+
+    with nc.Dataset(ds_3dims_3vars_4coords_1group_part1, "r") as ds:
+        expected = retrieve_history(ds)
+
+    assert retrieve_history_from_file(ds_3dims_3vars_4coords_1group_part1) == expected
+
+
+def test_retrieve_history_from_file_without_history(ds_3dims_3vars_4coords_1group_part1):
+    assert retrieve_history_from_file(ds_3dims_3vars_4coords_1group_part1) == {}
+
+
+def test_deduplicate_history_keeps_first_of_identical_entries():
+    shared_ancestor = {"program": "l2gen", "parameters": {"b": 1, "a": 2}}
+    history_json = [
+        shared_ancestor,
+        {"program": "subsetter"},
+        {"parameters": {"a": 2, "b": 1}, "program": "l2gen"},
+    ]
+
+    assert deduplicate_history(history_json) == [shared_ancestor, {"program": "subsetter"}]
+
+
+def test_dumps_history_format_is_pinned():
+    history_json = [
+        {
+            "date_time": datetime(2024, 3, 28, 15, 43, 53, tzinfo=timezone.utc),
+            "parameters": {"step": np.int16(3)},
+        }
+    ]
+
+    assert dumps_history(history_json) == (
+        '[{"date_time": "2024-03-28 15:43:53+00:00", "parameters": {"step": "3"}}]'
+    )
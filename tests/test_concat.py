@@ -5,9 +5,11 @@
 from pathlib import Path
 
 import netCDF4 as nc
+import numpy as np
 import pytest
 
-from concatenator.dataset_and_group_handling import GROUP_DELIM
+import concatenator.stitchee
+from concatenator.dataset_and_group_handling import GROUP_DELIM, validate_workable_files
 from concatenator.stitchee import stitchee
 
 from . import data_for_tests_dir
@@ -26,6 +28,7 @@ class TestConcat:
         concat_method: str = "xarray-concat",
         record_dim_name: str = "mirror_step",
         concat_kwargs: dict | None = None,
+        compress_output: bool = True,
     ):
         output_path = str(output_dir.joinpath(output_name))  # type: ignore
         prepared_input_files = prep_input_files(input_dir, output_dir)
@@ -41,6 +44,7 @@ class TestConcat:
             concat_method=concat_method,
             concat_dim=record_dim_name,
             concat_kwargs=concat_kwargs,
+            compress_output=compress_output,
         )
 
         merged_dataset = nc.Dataset(output_path)
@@ -92,6 +96,113 @@ class TestConcat:
             )
         )
 
+    def test_simple_sample_with_inputs_opened_in_memory(
+        self,
+        temp_output_dir,
+        ds_3dims_3vars_4coords_1group_part1,
+        ds_3dims_3vars_4coords_1group_part2,
+    ):
+        input_files = [
+            str(ds_3dims_3vars_4coords_1group_part1),
+            str(ds_3dims_3vars_4coords_1group_part2),
+        ]
+        original_contents = [Path(file).read_bytes() for file in input_files]
+
+        output_path = stitchee(
+            files_to_concat=input_files,
+            output_file=str(temp_output_dir / "simple_sample_inputs_in_memory.nc"),
+            concat_method="xarray-concat",
+            concat_dim="step",
+            open_inputs_in_memory=True,
+        )
+
+        # The input files are left untouched, while the output is still concatenated.
+        assert [Path(file).read_bytes() for file in input_files] == original_contents
+        with nc.Dataset(output_path) as merged_dataset:
+            assert merged_dataset.dimensions["step"].size == 6
+
+    def test_simple_sample_written_uncompressed(
+        self,
+        temp_toy_data_dir,
+        temp_output_dir,
+        ds_3dims_3vars_4coords_1group_part1,
+        ds_3dims_3vars_4coords_1group_part2,
+    ):
+        merged_data = self.run_verification_with_stitchee(
+            input_dir=temp_toy_data_dir,
+            output_dir=temp_output_dir,
+            output_name="simple_sample_concatenated_uncompressed.nc",
+            record_dim_name="step",
+            concat_method="xarray-concat",
+            compress_output=False,
+        )
+
+        var2 = merged_data.groups["Group1"].variables["var2"]
+        assert var2.shape == (6, 7, 2)
+        assert var2.chunking() == "contiguous"
+        assert not var2.filters()["zlib"]
+
+    def test_simple_sample_with_differing_track_is_outer_joined(
+        self,
+        temp_output_dir,
+        ds_3dims_3vars_4coords_1group_part1,
+        ds_3dims_3vars_4coords_1group_part2,
+    ):
+        with nc.Dataset(ds_3dims_3vars_4coords_1group_part2, "r+") as ncds:
+            ncds["track"][:] = [2, 3, 4, 5, 6, 7, 8]
+
+        output_path = stitchee(
+            files_to_concat=[
+                str(ds_3dims_3vars_4coords_1group_part1),
+                str(ds_3dims_3vars_4coords_1group_part2),
+            ],
+            output_file=str(temp_output_dir / "simple_sample_differing_track.nc"),
+            concat_method="xarray-concat",
+            concat_dim="step",
+        )
+
+        # The track values are not relabelled, but aligned, with missing values padded.
+        with nc.Dataset(output_path) as merged_dataset:
+            assert list(merged_dataset["track"][:]) == [1, 2, 3, 4, 5, 6, 7, 8]
+            var0 = merged_dataset["var0"][:]
+            assert var0.shape == (6, 8)
+            assert np.isnan(var0[0, 7]) and np.isnan(var0[3, 0])
+            assert var0[3, 1] == 33
+
+    @pytest.mark.parametrize("trust_inputs", [True, False])
+    def test_simple_sample_validation_with_trust_inputs(
+        self,
+        temp_output_dir,
+        ds_3dims_3vars_4coords_1group_part1,
+        ds_3dims_3vars_4coords_1group_part2,
+        monkeypatch,
+        trust_inputs,
+    ):
+        validated_files = []
+
+        def record_validation(files, logger):
+            validated_files.extend(files)
+            return validate_workable_files(files, logger)
+
+        monkeypatch.setattr(concatenator.stitchee, "validate_workable_files", record_validation)
+        input_files = [
+            str(ds_3dims_3vars_4coords_1group_part1),
+            str(ds_3dims_3vars_4coords_1group_part2),
+        ]
+
+        output_path = stitchee(
+            files_to_concat=input_files,
+            output_file=str(temp_output_dir / "simple_sample_trusted.nc"),
+            concat_method="xarray-concat",
+            concat_dim="step",
+            trust_inputs=trust_inputs,
+        )
+
+        # Input files are only validated if they are not trusted.
+        assert validated_files == ([] if trust_inputs else input_files)
+        with nc.Dataset(output_path) as merged_dataset:
+            assert merged_dataset.dimensions["step"].size == 6
+
     def test_tempo_no2_concat_with_stitchee(self, temp_output_dir):
         self.run_verification_with_stitchee(
             input_dir=data_for_tests_dir / "tempo/no2",
@@ -3,13 +3,17 @@
 # pylint: disable=C0116, C0301
 
 import netCDF4 as nc
+import numpy as np
+import xarray as xr
 
 from concatenator.attribute_handling import (
     _flatten_coordinate_attribute,
     regroup_coordinate_attribute,
 )
 from concatenator.dataset_and_group_handling import (
+    _first_chunk_index,
     _is_file_empty,
+    regroup_flattened_dataset,
     validate_workable_files
 )
 
@@ -84,3 +88,54 @@ def test_coordinate_attribute_regrouping():
         )
         == "time longitude latitude ozone_profile_pressure ozone_profile_altitude"
     )
+
+
+def test_dataset_with_values_only_in_a_later_group_is_identified_as_not_empty(tmp_path):
+    """Ensure that groups after the first one are also checked for non-null arrays."""
+    with nc.Dataset(tmp_path / "values_in_second_group.nc", "w", diskless=True) as ds:
+        ds.createDimension("step", 2)
+        ds.createGroup("Group1").createVariable("var1", "f4", ("step",))[:] = [np.nan, np.nan]
+        ds.createGroup("Group2").createVariable("var2", "f4", ("step",))[:] = [1.0, 2.0]
+
+        assert _is_file_empty(ds) is False
+
+
+def test_dataset_with_values_only_after_the_first_chunk_is_identified_as_not_empty(tmp_path):
+    """Ensure that a variable whose first chunk is all fill values is read in full."""
+    with nc.Dataset(tmp_path / "values_after_first_chunk.nc", "w") as ds:
+        ds.createDimension("step", 10)
+        var = ds.createVariable("var0", "f4", ("step",), chunksizes=(2,))
+        var[:] = [np.nan, np.nan, np.nan, np.nan, np.nan, 1.0, np.nan, np.nan, np.nan, np.nan]
+
+    with nc.Dataset(tmp_path / "values_after_first_chunk.nc") as ds:
+        assert _first_chunk_index(ds["var0"]) == (slice(0, 2),)
+        assert _is_file_empty(ds) is False
+
+
+def test_dataset_with_chunked_fill_values_is_identified_as_empty(tmp_path):
+    """Ensure that a chunked variable with only fill values in every chunk is identified as empty."""
+    with nc.Dataset(tmp_path / "chunked_fill_values.nc", "w") as ds:
+        ds.createDimension("step", 10)
+        ds.createDimension("track", 4)
+        ds.createVariable("var0", "f4", ("step", "track"), chunksizes=(2, 2))
+
+    with nc.Dataset(tmp_path / "chunked_fill_values.nc") as ds:
+        assert _first_chunk_index(ds["var0"]) == (slice(0, 2), slice(0, 2))
+        assert _is_file_empty(ds)
+
+
+def test_uncompressed_output_with_zero_length_dimension(tmp_path):
+    """Ensure that variables with a zero-length dimension can be written uncompressed."""
+    dataset = xr.Dataset(
+        {
+            "__Group1__var1": (("__step", "__Group1__level"), np.empty((3, 0), dtype="f4")),
+            "__var0": (("__step",), np.arange(3, dtype="f4")),
+        }
+    )
+
+    regroup_flattened_dataset(dataset, str(tmp_path / "output.nc"), None, compress=False)
+
+    with nc.Dataset(tmp_path / "output.nc") as ds:
+        assert ds["var0"].chunking() == "contiguous"
+        assert ds.groups["Group1"]["var1"].shape == (3, 0)
+        assert not ds.groups["Group1"]["var1"].filters()["zlib"]
@@ -0,0 +1,50 @@
+"""Tests for downloading granules in worker processes."""
+
+# pylint: disable=C0116
+
+import multiprocessing
+import time
+from pathlib import Path
+
+import pytest
+
+from concatenator.harmony import download_worker
+from concatenator.harmony.download_worker import multi_core_download_as_completed
+
+
+@pytest.fixture(name="fake_download")
+def fixture_fake_download(monkeypatch):
+    """Replaces the Harmony download with one that writes a small local file."""
+
+    def download(url, destination_dir, logger=None, access_token=None, cfg=None):
+        if "slow" in url:
+            time.sleep(60)
+        path = Path(destination_dir) / f"download-{Path(url).stem}.tmp"
+        path.write_text(url)
+        return str(path)
+
+    monkeypatch.setattr(download_worker, "download", download)
+    monkeypatch.setattr(download_worker, "build_logger", lambda cfg: None)
+
+
+def test_multi_core_download_as_completed(tmp_path, fake_download):
+    urls = [f"https://example.com/granule{i}.nc4" for i in range(5)]
+
+    paths = list(multi_core_download_as_completed(urls, str(tmp_path), "token", {}, 2))
+
+    assert sorted(path.name for path in paths) == [f"granule{i}.nc4" for i in range(5)]
+    assert all(path.read_text().endswith(path.name) for path in paths)
+    assert multiprocessing.active_children() == []
+
+
+def test_multi_core_download_as_completed_stopped_early(tmp_path, fake_download):
+    urls = ["https://example.com/granule0.nc4"] + [
+        f"https://example.com/slow{i}.nc4" for i in range(2)
+    ]
+
+    downloads = multi_core_download_as_completed(urls, str(tmp_path), "token", {}, 2)
+    assert next(downloads).name == "granule0.nc4"
+    downloads.close()
+
+    # The workers still downloading are stopped, rather than left running.
+    assert multiprocessing.active_children() == []
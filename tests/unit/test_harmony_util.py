@@ -0,0 +1,91 @@
+"""Tests for the Harmony utility functions."""
+
+# pylint: disable=C0116
+
+from datetime import datetime, timezone
+
+import pytest
+from pystac import Asset, Item
+
+from concatenator.harmony.util import _summarize_items
+
+
+def _make_item(item_id, bbox, start, end, assets):
+    item = Item(
+        item_id,
+        None,
+        bbox,
+        start if start == end else None,
+        {} if start == end else {"start_datetime": start, "end_datetime": end},
+    )
+    if start != end:
+        item.common_metadata.start_datetime = start
+        item.common_metadata.end_datetime = end
+    for key, (href, roles, media_type) in assets.items():
+        item.add_asset(key, Asset(href, media_type=media_type, roles=roles))
+    return item
+
+
+def test_summarize_items_in_a_single_pass():
+    items = [
+        _make_item(
+            "first",
+            [-10.0, -5.0, 10.0, 5.0],
+            datetime(2024, 1, 1, 12, tzinfo=timezone.utc),
+            datetime(2024, 1, 1, 12, tzinfo=timezone.utc),
+            {
+                "metadata": ("https://example.com/first.xml", ["metadata"], None),
+                "data": ("https://example.com/first.nc4", ["data"], None),
+            },
+        ),
+        _make_item(
+            "no_bbox",
+            None,
+            datetime(2024, 1, 1, 6, tzinfo=timezone.utc),
+            None,
+            {"data": ("https://example.com/no_bbox", ["data"], "application/x-netcdf4")},
+        ),
+        _make_item(
+            "last",
+            [-20.0, 0.0, 5.0, 15.0],
+            None,
+            datetime(2024, 1, 2, tzinfo=timezone.utc),
+            {
+                "visual": ("https://example.com/last.png", ["visual"], "image/png"),
+                "data": ("https://example.com/last.nc", ["data", "visual"], None),
+            },
+        ),
+    ]
+
+    first_item, netcdf_urls, bounding_box, date_range = _summarize_items(iter(items))
+
+    assert first_item is items[0]
+    assert netcdf_urls == [
+        "https://example.com/first.nc4",
+        "https://example.com/no_bbox",
+        "https://example.com/last.nc",
+    ]
+    assert bounding_box == [-20.0, -5.0, 10.0, 15.0]
+    assert date_range == {
+        "start_datetime": "2024-01-01T06:00:00+00:00",
+        "end_datetime": "2024-01-02T00:00:00+00:00",
+    }
+
+
+def test_summarize_items_without_items():
+    assert _summarize_items(iter([])) == (None, [], None, {})
+
+
+def test_summarize_items_without_netcdf_asset():
+    items = [
+        _make_item(
+            "no_data",
+            None,
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            datetime(2024, 1, 1, tzinfo=timezone.utc),
+            {"data": ("https://example.com/granule.h5", ["data"], "application/x-hdf5")},
+        )
+    ]
+
+    with pytest.raises(RuntimeError):
+        _summarize_items(items)
@@ -0,0 +1,208 @@
+"""Tests for the helpers of the command line interface."""
+
+# pylint: disable=C0116
+
+import json
+import os
+import shutil
+import stat
+
+import netCDF4 as nc
+import pytest
+
+from concatenator import attribute_handling
+from concatenator.run_stitchee import (
+    _copy_file,
+    _copy_file_range,
+    _copy_input_file,
+    _gather_history,
+    _prune_history_cache,
+    _retrieve_history_with_cache,
+    parse_args,
+    run_stitchee,
+)
+from concatenator.stitchee import stitchee
+
+HISTORY = [{"program": "stitchee", "parameters": "input_files=[]"}]
+
+
+def _write_file_with_history(filepath, history=None):
+    with nc.Dataset(filepath, "w") as ncds:
+        ncds.setncattr("history_json", json.dumps(HISTORY if history is None else history))
+    os.utime(filepath, ns=(0, 0))
+    return str(filepath)
+
+
+def test_copy_of_read_only_input_is_writable(tmp_path):
+    input_file = _write_file_with_history(tmp_path / "granule.nc")
+    os.chmod(input_file, 0o444)
+    dest_dir = tmp_path / "copies"
+    dest_dir.mkdir()
+
+    copied_file = _copy_input_file(input_file, dest_dir)
+
+    assert os.stat(copied_file).st_mode & stat.S_IWUSR
+
+
+def test_history_cache_requires_inputs_without_copies(tmp_path):
+    output_path = str(tmp_path / "output.nc")
+
+    with pytest.raises(ValueError):
+        parse_args([str(tmp_path), "-o", output_path, "--concat_dim", "step", "--history_cache"])
+
+
+def test_history_cache_miss_then_hit(tmp_path, monkeypatch):
+    input_file = _write_file_with_history(tmp_path / "granule.nc")
+    cache_dir = tmp_path / "cache"
+
+    assert _retrieve_history_with_cache(input_file, cache_dir) == HISTORY
+    # The entry is written atomically: a single cache file, and no temporary file left behind.
+    assert [path.suffix for path in cache_dir.iterdir()] == [".json"]
+
+    def fail_to_read(filepath):
+        raise AssertionError("The input file should not be read again.")
+
+    monkeypatch.setattr(attribute_handling, "retrieve_history_from_file", fail_to_read)
+    assert _retrieve_history_with_cache(input_file, cache_dir) == HISTORY
+
+
+def test_history_cache_is_keyed_by_path(tmp_path):
+    first_dir, second_dir = tmp_path / "first", tmp_path / "second"
+    first_dir.mkdir()
+    second_dir.mkdir()
+    other_history = [{"program": "concater", "parameters": "input_files=[]"}]
+    first_file = _write_file_with_history(first_dir / "granule.nc")
+    second_file = _write_file_with_history(second_dir / "granule.nc", other_history)
+    assert os.path.getsize(first_file) == os.path.getsize(second_file)
+    cache_dir = tmp_path / "cache"
+
+    assert _retrieve_history_with_cache(first_file, cache_dir) == HISTORY
+    assert _retrieve_history_with_cache(second_file, cache_dir) == other_history
+
+
+def test_history_cache_failed_write_leaves_no_files(tmp_path, monkeypatch):
+    input_file = _write_file_with_history(tmp_path / "granule.nc")
+    cache_dir = tmp_path / "cache"
+
+    def fail_to_dump(obj, file):
+        file.write("[{")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(json, "dump", fail_to_dump)
+
+    assert _retrieve_history_with_cache(input_file, cache_dir) == HISTORY
+    assert list(cache_dir.iterdir()) == []
+
+
+@pytest.mark.parametrize("num_entries", [2, 5])
+def test_prune_history_cache_keeps_newest_entries(tmp_path, num_entries):
+    for i in range(num_entries):
+        cache_file = tmp_path / f"{i}.json"
+        cache_file.write_text("[]")
+        os.utime(cache_file, ns=(i, i))
+
+    _prune_history_cache(tmp_path, max_entries=3)
+
+    expected = [f"{i}.json" for i in range(max(0, num_entries - 3), num_entries)]
+    assert sorted(path.name for path in tmp_path.iterdir()) == expected
+
+
+def test_gather_history_keeps_input_order(tmp_path):
+    input_files = [
+        _write_file_with_history(tmp_path / f"granule{i}.nc", [{"program": f"step{i}"}])
+        for i in range(3)
+    ]
+
+    assert _gather_history(input_files) == [{"program": f"step{i}"} for i in range(3)]
+
+
+def _describe_variables(group):
+    """Collect the values and storage of every variable, for comparing output files."""
+    description = {
+        name: (var.dimensions, var[:].tolist(), var.chunking(), var.filters()["zlib"])
+        for name, var in group.variables.items()
+    }
+    for group_name, subgroup in group.groups.items():
+        description[group_name] = _describe_variables(subgroup)
+    return description
+
+
+def test_single_input_matches_stitchee_output(tmp_path, ds_3dims_3vars_4coords_1group_part1):
+    output_path = tmp_path / "output" / "single.nc"
+    output_path.parent.mkdir()
+    input_copy = tmp_path / "input_copy.nc"
+    shutil.copyfile(ds_3dims_3vars_4coords_1group_part1, input_copy)
+
+    run_stitchee(
+        [
+            str(ds_3dims_3vars_4coords_1group_part1.parent),
+            "-o",
+            str(output_path),
+            "--concat_dim",
+            "step",
+        ]
+    )
+    expected_path = stitchee(
+        [str(input_copy)], str(tmp_path / "expected.nc"), concat_dim="step", keep_tmp_files=False
+    )
+
+    with nc.Dataset(output_path) as ncds, nc.Dataset(expected_path) as expected_ncds:
+        assert "stitchee" in ncds.getncattr("history_json")
+        assert _describe_variables(ncds) == _describe_variables(expected_ncds)
+
+
+def test_single_input_with_invalid_concat_dim(tmp_path, ds_3dims_3vars_4coords_1group_part1):
+    output_path = tmp_path / "output" / "single.nc"
+    output_path.parent.mkdir()
+
+    with pytest.raises(KeyError):
+        run_stitchee(
+            [
+                str(ds_3dims_3vars_4coords_1group_part1.parent),
+                "-o",
+                str(output_path),
+                "--concat_dim",
+                "not_a_dimension",
+            ]
+        )
+
+
+def test_single_input_written_uncompressed(tmp_path, ds_3dims_3vars_4coords_1group_part1):
+    output_path = tmp_path / "output" / "single.nc"
+    output_path.parent.mkdir()
+
+    run_stitchee(
+        [
+            str(ds_3dims_3vars_4coords_1group_part1.parent),
+            "-o",
+            str(output_path),
+            "--concat_dim",
+            "step",
+            "--no_output_compression",
+        ]
+    )
+
+    with nc.Dataset(output_path) as ncds:
+        var2 = ncds.groups["Group1"].variables["var2"]
+        assert var2.chunking() == "contiguous"
+        assert not var2.filters()["zlib"]
+
+
+def test_incomplete_copy_file_range_falls_back_to_a_regular_copy(tmp_path, monkeypatch):
+    src = tmp_path / "source.nc"
+    src.write_bytes(bytes(range(256)) * 64)
+    dst = tmp_path / "copy.nc"
+
+    def copy_only_the_first_bytes(fd_src, fd_dst, count, *args):
+        if os.lseek(fd_src, 0, os.SEEK_CUR) > 0:
+            return 0
+        os.write(fd_dst, os.read(fd_src, 100))
+        return 100
+
+    monkeypatch.setattr(os, "copy_file_range", copy_only_the_first_bytes, raising=False)
+
+    with pytest.raises(OSError):
+        _copy_file_range(str(src), dst)
+    _copy_file(str(src), dst)
+
+    assert dst.read_bytes() == src.read_bytes()